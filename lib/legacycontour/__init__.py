@@ -1,4 +1,5 @@
-from contextlib import contextmanager
+import collections.abc
+from collections import namedtuple
 import functools
 import inspect
 import os
@@ -7,7 +8,6 @@ import warnings
 
 import matplotlib as mpl
 from inspect import cleandoc as dedent
-import six
 
 from legacycontour.contourset import LegacyContourSet
 
@@ -22,19 +22,28 @@ __version__numpy__ = str('1.7.1')  # minimum required numpy version
 
 __all__ = ['contour', 'contourf']
 
+_MappingView = collections.abc.MappingView
+_VAR_POS = inspect.Parameter.VAR_POSITIONAL
+_VAR_KW = inspect.Parameter.VAR_KEYWORD
+_KW_ONLY = inspect.Parameter.KEYWORD_ONLY
+
 
 # Copied over from the v2.1.2 matplotlib/cbook/__init__.py
 def _sanitize_sequence(data):
     """Converts dictview object to list"""
-    import collections
-    return list(data) if isinstance(data, collections.MappingView) else data
+    return list(data) if isinstance(data, _MappingView) else data
+
+
+def _sanitize_args(args):
+    """Return *args* with any dictview object converted to a list."""
+    for a in args:
+        if isinstance(a, _MappingView):
+            return tuple(_sanitize_sequence(a) for a in args)
+    return args
 
 
 def _get_label(y, default_name):
-    try:
-        return y.name
-    except AttributeError:
-        return default_name
+    return getattr(y, 'name', default_name)
 
 
 # Copied over from the v2.1.2 matplotlib/__init__.py
@@ -43,14 +52,69 @@ def _replacer(data, key):
     converts input data to a sequence as needed.
     """
     # if key isn't a string don't bother
-    if not isinstance(key, six.string_types):
-        return (key)
+    if not isinstance(key, str):
+        return key
     # try to use __getitem__
+    # (the result is deliberately not cached across calls: *data* is usually
+    # a dict, which is mutable and can't be weakly referenced, so there is
+    # no safe way to notice when a cached value goes stale)
     try:
-        return _sanitize_sequence(data[key])
+        value = data[key]
     # key does not exist, silently fall back to key
     except KeyError:
         return key
+    # same as _sanitize_sequence, inlined as this runs for every argument
+    return list(value) if isinstance(value, _MappingView) else value
+
+
+def _replace_positions(arg_names, replace_names):
+    """
+    Return the positions in *arg_names* of the names in *replace_names*,
+    or None if all arguments are to be replaced.
+    """
+    if replace_names is None or arg_names is None:
+        return None
+    return frozenset(j for j, name in enumerate(arg_names)
+                     if name in replace_names)
+
+
+def _replace_data(data, args, kwargs, replace_names, replace_all_args,
+                  arg_names, replace_positions):
+    """
+    Return *args* and *kwargs* with the values looked up in *data* for
+    those arguments that `_preprocess_data` was asked to replace.
+
+    *replace_positions* are the positions in *arg_names* to replace, as
+    returned by `_replace_positions`.
+    """
+    if (replace_names is None) or (replace_all_args is True):
+        # all should be replaced
+        args = tuple(_replacer(data, a) for a in args)
+    else:
+        # An arg is replaced if the arg_name of that position is
+        #   in replace_names ...
+        if len(arg_names) < len(args):
+            raise RuntimeError(
+                "Got more args than function expects")
+        new_args = None
+        for j in replace_positions:
+            if j < len(args):
+                if new_args is None:
+                    new_args = list(args)
+                new_args[j] = _replacer(data, args[j])
+        if new_args is not None:
+            args = tuple(new_args)
+
+    # kwargs is the wrapper's own dict, so it can be updated in place
+    if replace_names is None:
+        # replace all kwargs ...
+        for k in kwargs:
+            kwargs[k] = _replacer(data, kwargs[k])
+    else:
+        # ... or only if a kwarg of that name is in replace_names
+        for k in kwargs.keys() & replace_names:
+            kwargs[k] = _replacer(data, kwargs[k])
+    return args, kwargs
 
 
 _DATA_DOC_APPENDIX = """
@@ -64,6 +128,140 @@ _DATA_DOC_APPENDIX = """
 """
 
 
+@functools.lru_cache(maxsize=None)
+def _data_doc_appendix(replace_names, replace_all_args):
+    """
+    Return the note on the *data* kwarg that `_preprocess_data` appends to
+    the docstring of the decorated function.
+    """
+    _repl = ""
+    if replace_names is None:
+        _repl = "* All positional and all keyword arguments."
+    else:
+        if len(replace_names) != 0:
+            _repl = "* All arguments with the following names: '{names}'."
+        if replace_all_args:
+            _repl += "\n    * All positional arguments."
+        _repl = _repl.format(names="', '".join(sorted(replace_names)))
+    return _DATA_DOC_APPENDIX.format(replaced=_repl)
+
+
+_WrapperMeta = namedtuple(
+    '_WrapperMeta', ['new_sig', 'arg_names', 'replace_positions', 'label_pos',
+                     'label_namer_pos', 'arg_names_at_runtime',
+                     'has_varkwargs'])
+
+
+@functools.lru_cache(maxsize=None)
+def _compute_wrapper_meta(func, replace_names, replace_all_args, label_namer,
+                          positional_parameter_names):
+    """
+    Introspect *func* for `_preprocess_data` and return a `_WrapperMeta`.
+
+    The result only depends on the (hashable) arguments, so it is cached:
+    building a new `inspect.Signature` is expensive and identical
+    decorations of the same function can share the outcome.
+    """
+    sig = inspect.signature(func)
+    _has_varargs = False
+    _has_varkwargs = False
+    _arg_names = []
+    params = list(sig.parameters.values())
+    for p in params:
+        if p.kind is _VAR_POS:
+            _has_varargs = True
+        elif p.kind is _VAR_KW:
+            _has_varkwargs = True
+        else:
+            _arg_names.append(p.name)
+    data_param = inspect.Parameter('data', _KW_ONLY, default=None)
+    if _has_varkwargs:
+        params.insert(-1, data_param)
+    else:
+        params.append(data_param)
+    new_sig = sig.replace(parameters=params)
+    # Import-time check: do we have enough information to replace *args?
+    arg_names_at_runtime = False
+    # there can't be any positional arguments behind *args and no
+    # positional args can end up in **kwargs, so only *varargs make
+    # problems.
+    # http://stupidpythonideas.blogspot.de/2013/08/arguments-and-parameters.html
+    if not _has_varargs:
+        # all args are "named", so no problem
+        # remove the first "ax" / self arg
+        arg_names = _arg_names[1:]
+    else:
+        # Here we have "unnamed" variables and we need a way to determine
+        # whether to replace a arg or not
+        if replace_names is None:
+            # all argnames should be replaced
+            arg_names = None
+        elif len(replace_names) == 0:
+            # No argnames should be replaced
+            arg_names = []
+        elif len(_arg_names) > 1 and (positional_parameter_names is None):
+            # we got no manual parameter names but more than an 'ax' ...
+            if len(replace_names - set(_arg_names[1:])) == 0:
+                # all to be replaced arguments are in the list
+                arg_names = _arg_names[1:]
+            else:
+                msg = ("Got unknown 'replace_names' and wrapped function "
+                       "'%s' uses '*args', need "
+                       "'positional_parameter_names'!")
+                raise AssertionError(msg % func.__name__)
+        else:
+            if positional_parameter_names is not None:
+                if callable(positional_parameter_names):
+                    # determined by the function at runtime
+                    arg_names_at_runtime = True
+                    # so that we don't compute the label_pos at import time
+                    arg_names = []
+                else:
+                    arg_names = list(positional_parameter_names)
+            else:
+                if replace_all_args:
+                    arg_names = []
+                else:
+                    msg = ("Got 'replace_names' and wrapped function "
+                           "'%s' uses *args, need "
+                           "'positional_parameter_names' or "
+                           "'replace_all_args'!")
+                    raise AssertionError(msg % func.__name__)
+
+    # compute the possible label_namer and label position in positional
+    # arguments
+    label_pos = 9999  # bigger than all "possible" argument lists
+    label_namer_pos = 9999  # bigger than all "possible" argument lists
+    if (label_namer and  # we actually want a label here ...
+            arg_names and  # and we can determine a label in *args ...
+            (label_namer in arg_names)):  # and it is in *args
+        label_namer_pos = arg_names.index(label_namer)
+        if "label" in arg_names:
+            label_pos = arg_names.index("label")
+
+    # Check the case we know a label_namer but we can't find it the
+    # arg_names... Unfortunately the label_namer can be in **kwargs,
+    # which we can't detect here and which results in a non-set label
+    # which might surprise the user :-(
+    if label_namer and not arg_names_at_runtime and not _has_varkwargs:
+        if not arg_names:
+            msg = ("label_namer '%s' can't be found as the parameter "
+                   "without 'positional_parameter_names'.")
+            raise AssertionError(msg % label_namer)
+        elif label_namer not in arg_names:
+            msg = ("label_namer '%s' can't be found in the parameter "
+                   "names (known argnames: %s).")
+            raise AssertionError(msg % (label_namer, arg_names))
+        else:
+            # this is the case when the name is in arg_names
+            pass
+
+    return _WrapperMeta(new_sig, arg_names,
+                        _replace_positions(arg_names, replace_names),
+                        label_pos, label_namer_pos,
+                        arg_names_at_runtime, _has_varkwargs)
+
+
 def _preprocess_data(replace_names=None, replace_all_args=False,
                      label_namer=None, positional_parameter_names=None):
     """
@@ -102,272 +300,171 @@ def _preprocess_data(replace_names=None, replace_all_args=False,
     .. note:: decorator also converts MappingView input data to list.
     """
     if replace_names is not None:
-        replace_names = set(replace_names)
+        # frozen so that it can be part of the _compute_wrapper_meta cache key
+        replace_names = frozenset(replace_names)
 
     def param(func):
-        new_sig = None
-        # signature is since 3.3 and wrapped since 3.2, but we support 3.4+.
-        python_has_signature = python_has_wrapped = six.PY3
-
-        # if in a legacy version of python and IPython is already imported
-        # try to use their back-ported signature
-        if not python_has_signature and 'IPython' in sys.modules:
-            try:
-                import IPython.utils.signatures
-                signature = IPython.utils.signatures.signature
-                Parameter = IPython.utils.signatures.Parameter
-            except ImportError:
-                pass
-            else:
-                python_has_signature = True
+        if isinstance(positional_parameter_names, list):
+            _pos_names = tuple(positional_parameter_names)
         else:
-            if python_has_signature:
-                signature = inspect.signature
-                Parameter = inspect.Parameter
-
-        if not python_has_signature:
-            arg_spec = inspect.getargspec(func)
-            _arg_names = arg_spec.args
-            _has_varargs = arg_spec.varargs is not None
-            _has_varkwargs = arg_spec.keywords is not None
-        else:
-            sig = signature(func)
-            _has_varargs = False
-            _has_varkwargs = False
-            _arg_names = []
-            params = list(sig.parameters.values())
-            for p in params:
-                if p.kind is Parameter.VAR_POSITIONAL:
-                    _has_varargs = True
-                elif p.kind is Parameter.VAR_KEYWORD:
-                    _has_varkwargs = True
+            _pos_names = positional_parameter_names
+        meta = _compute_wrapper_meta(func, replace_names, replace_all_args,
+                                     label_namer, _pos_names)
+        new_sig = meta.new_sig
+        arg_names = meta.arg_names
+        replace_positions = meta.replace_positions
+        label_pos = meta.label_pos
+        label_namer_pos = meta.label_namer_pos
+        arg_names_at_runtime = meta.arg_names_at_runtime
+
+        if not label_namer and replace_names is None:
+            # The plain ``@_preprocess_data()`` case: every argument is
+            # looked up in data, so there are no names to check at all.
+            def inner(ax, *args, **kwargs):
+                data = kwargs.pop('data', None)
+                if data is None:
+                    return func(ax, *_sanitize_args(args), **kwargs)
+                args = tuple(_replacer(data, a) for a in args)
+                for k in kwargs:
+                    kwargs[k] = _replacer(data, kwargs[k])
+                return func(ax, *args, **kwargs)
+        elif not label_namer:
+            # Without a label_namer all the label handling above is known to
+            # be a no-op at decoration time, so use a leaner wrapper that
+            # only deals with the data replacement.
+            def inner(ax, *args, **kwargs):
+                data = kwargs.pop('data', None)
+                if data is None:
+                    return func(ax, *_sanitize_args(args), **kwargs)
+                if arg_names_at_runtime:
+                    _arg_names = positional_parameter_names(args, data)
+                    _replace_pos = _replace_positions(_arg_names,
+                                                      replace_names)
                 else:
-                    _arg_names.append(p.name)
-            data_param = Parameter('data',
-                                   Parameter.KEYWORD_ONLY,
-                                   default=None)
-            if _has_varkwargs:
-                params.insert(-1, data_param)
-            else:
-                params.append(data_param)
-            new_sig = sig.replace(parameters=params)
-        # Import-time check: do we have enough information to replace *args?
-        arg_names_at_runtime = False
-        # there can't be any positional arguments behind *args and no
-        # positional args can end up in **kwargs, so only *varargs make
-        # problems.
-        # http://stupidpythonideas.blogspot.de/2013/08/arguments-and-parameters.html
-        if not _has_varargs:
-            # all args are "named", so no problem
-            # remove the first "ax" / self arg
-            arg_names = _arg_names[1:]
+                    _arg_names = arg_names
+                    _replace_pos = replace_positions
+                args, kwargs = _replace_data(data, args, kwargs,
+                                             replace_names, replace_all_args,
+                                             _arg_names, _replace_pos)
+                return func(ax, *args, **kwargs)
         else:
-            # Here we have "unnamed" variables and we need a way to determine
-            # whether to replace a arg or not
-            if replace_names is None:
-                # all argnames should be replaced
-                arg_names = None
-            elif len(replace_names) == 0:
-                # No argnames should be replaced
-                arg_names = []
-            elif len(_arg_names) > 1 and (positional_parameter_names is None):
-                # we got no manual parameter names but more than an 'ax' ...
-                if len(replace_names - set(_arg_names[1:])) == 0:
-                    # all to be replaced arguments are in the list
-                    arg_names = _arg_names[1:]
+            def inner(ax, *args, **kwargs):
+                data = kwargs.pop('data', None)
+
+                # this is needed because we want to change these values if
+                # arg_names_at_runtime==True, but python does not allow
+                # assigning to a variable in a outer scope. So use some new
+                # local ones and set them to the already computed values.
+                _label_pos = label_pos
+                _label_namer_pos = label_namer_pos
+                _arg_names = arg_names
+                _replace_pos = replace_positions
+
+                label = None
+
+                if data is None:  # data validation
+                    args = _sanitize_args(args)
                 else:
-                    msg = ("Got unknown 'replace_names' and wrapped function "
-                           "'%s' uses '*args', need "
-                           "'positional_parameter_names'!")
-                    raise AssertionError(msg % func.__name__)
-            else:
-                if positional_parameter_names is not None:
-                    if callable(positional_parameter_names):
-                        # determined by the function at runtime
-                        arg_names_at_runtime = True
-                        # so that we don't compute the label_pos at import time
-                        arg_names = []
+                    if arg_names_at_runtime:
+                        # update the information about replace names and
+                        # label position
+                        _arg_names = positional_parameter_names(args, data)
+                        _replace_pos = _replace_positions(_arg_names,
+                                                          replace_names)
+                        # only if we can find a label in *args
+                        if _arg_names and label_namer in _arg_names:
+                            _label_namer_pos = _arg_names.index(label_namer)
+                            if "label" in _arg_names:
+                                _label_pos = arg_names.index("label")
+
+                    # save the current label_namer value so that it can be used
+                    # as a label
+                    if _label_namer_pos < len(args):
+                        label = args[_label_namer_pos]
                     else:
-                        arg_names = positional_parameter_names
-                else:
-                    if replace_all_args:
-                        arg_names = []
+                        label = kwargs.get(label_namer, None)
+                    # ensure a string, as label can't be anything else
+                    if not isinstance(label, str):
+                        label = None
+
+                    args, kwargs = _replace_data(data, args, kwargs,
+                                                 replace_names,
+                                                 replace_all_args,
+                                                 _arg_names, _replace_pos)
+
+                # replace the label if the user didn't set one. Note: if the
+                # user puts in "label=None", it does *NOT* get replaced!
+                user_supplied_label = (
+                    (len(args) >= _label_pos) or  # label is included in args
+                    ('label' in kwargs)  # ... or in kwargs
+                )
+                if not user_supplied_label:
+                    if _label_namer_pos < len(args):
+                        kwargs['label'] = _get_label(args[_label_namer_pos],
+                                                     label)
+                    elif label_namer in kwargs:
+                        kwargs['label'] = _get_label(kwargs[label_namer],
+                                                     label)
                     else:
-                        msg = ("Got 'replace_names' and wrapped function "
-                               "'%s' uses *args, need "
-                               "'positional_parameter_names' or "
-                               "'replace_all_args'!")
-                        raise AssertionError(msg % func.__name__)
-
-        # compute the possible label_namer and label position in positional
-        # arguments
-        label_pos = 9999  # bigger than all "possible" argument lists
-        label_namer_pos = 9999  # bigger than all "possible" argument lists
-        if (label_namer and  # we actually want a label here ...
-                arg_names and  # and we can determine a label in *args ...
-                (label_namer in arg_names)):  # and it is in *args
-            label_namer_pos = arg_names.index(label_namer)
-            if "label" in arg_names:
-                label_pos = arg_names.index("label")
-
-        # Check the case we know a label_namer but we can't find it the
-        # arg_names... Unfortunately the label_namer can be in **kwargs,
-        # which we can't detect here and which results in a non-set label
-        # which might surprise the user :-(
-        if label_namer and not arg_names_at_runtime and not _has_varkwargs:
-            if not arg_names:
-                msg = ("label_namer '%s' can't be found as the parameter "
-                       "without 'positional_parameter_names'.")
-                raise AssertionError(msg % label_namer)
-            elif label_namer not in arg_names:
-                msg = ("label_namer '%s' can't be found in the parameter "
-                       "names (known argnames: %s).")
-                raise AssertionError(msg % (label_namer, arg_names))
-            else:
-                # this is the case when the name is in arg_names
-                pass
-
-        @functools.wraps(func)
-        def inner(ax, *args, **kwargs):
-            # this is needed because we want to change these values if
-            # arg_names_at_runtime==True, but python does not allow assigning
-            # to a variable in a outer scope. So use some new local ones and
-            # set them to the already computed values.
-            _label_pos = label_pos
-            _label_namer_pos = label_namer_pos
-            _arg_names = arg_names
-
-            label = None
-
-            data = kwargs.pop('data', None)
-
-            if data is None:  # data validation
-                args = tuple(_sanitize_sequence(a) for a in args)
-            else:
-                if arg_names_at_runtime:
-                    # update the information about replace names and
-                    # label position
-                    _arg_names = positional_parameter_names(args, data)
-                    if (label_namer and  # we actually want a label here ...
-                            _arg_names and  # and we can find a label in *args
-                            (label_namer in _arg_names)):  # and it is in *args
-                        _label_namer_pos = _arg_names.index(label_namer)
-                        if "label" in _arg_names:
-                            _label_pos = arg_names.index("label")
-
-                # save the current label_namer value so that it can be used as
-                # a label
-                if _label_namer_pos < len(args):
-                    label = args[_label_namer_pos]
-                else:
-                    label = kwargs.get(label_namer, None)
-                # ensure a string, as label can't be anything else
-                if not isinstance(label, six.string_types):
-                    label = None
-
-                if (replace_names is None) or (replace_all_args is True):
-                    # all should be replaced
-                    args = tuple(_replacer(data, a) for
-                                 j, a in enumerate(args))
-                else:
-                    # An arg is replaced if the arg_name of that position is
-                    #   in replace_names ...
-                    if len(_arg_names) < len(args):
-                        raise RuntimeError(
-                            "Got more args than function expects")
-                    args = tuple(_replacer(data, a)
-                                 if _arg_names[j] in replace_names else a
-                                 for j, a in enumerate(args))
-
-                if replace_names is None:
-                    # replace all kwargs ...
-                    kwargs = dict((k, _replacer(data, v))
-                                  for k, v in six.iteritems(kwargs))
-                else:
-                    # ... or only if a kwarg of that name is in replace_names
-                    kwargs = dict((k, _replacer(data, v)
-                                   if k in replace_names else v)
-                                  for k, v in six.iteritems(kwargs))
-
-            # replace the label if this func "wants" a label arg and the user
-            # didn't set one. Note: if the user puts in "label=None", it does
-            # *NOT* get replaced!
-            user_supplied_label = (
-                (len(args) >= _label_pos) or  # label is included in args
-                ('label' in kwargs)  # ... or in kwargs
-            )
-            if (label_namer and not user_supplied_label):
-                if _label_namer_pos < len(args):
-                    kwargs['label'] = _get_label(args[_label_namer_pos], label)
-                elif label_namer in kwargs:
-                    kwargs['label'] = _get_label(kwargs[label_namer], label)
-                else:
-                    import warnings
-                    msg = ("Tried to set a label via parameter '%s' in "
-                           "func '%s' but couldn't find such an argument. \n"
-                           "(This is a programming error, please report to "
-                           "the matplotlib list!)")
-                    warnings.warn(msg % (label_namer, func.__name__),
-                                  RuntimeWarning, stacklevel=2)
-            return func(ax, *args, **kwargs)
-        pre_doc = inner.__doc__
+                        msg = ("Tried to set a label via parameter '%s' "
+                               "in func '%s' but couldn't find such an "
+                               "argument. \n(This is a programming error, "
+                               "please report to the matplotlib list!)")
+                        warnings.warn(msg % (label_namer, func.__name__),
+                                      RuntimeWarning, stacklevel=2)
+                return func(ax, *args, **kwargs)
+
+        # Only the attributes that are actually used are copied over;
+        # functools.wraps would also copy __annotations__ and __dict__.
+        inner.__module__ = func.__module__
+        inner.__name__ = func.__name__
+        inner.__qualname__ = func.__qualname__
+        inner.__wrapped__ = func
+        pre_doc = func.__doc__
         if pre_doc is None:
             pre_doc = ''
         else:
             pre_doc = dedent(pre_doc)
-        _repl = ""
-        if replace_names is None:
-            _repl = "* All positional and all keyword arguments."
-        else:
-            if len(replace_names) != 0:
-                _repl = "* All arguments with the following names: '{names}'."
-            if replace_all_args:
-                _repl += "\n    * All positional arguments."
-            _repl = _repl.format(names="', '".join(sorted(replace_names)))
-        inner.__doc__ = (pre_doc +
-                         _DATA_DOC_APPENDIX.format(replaced=_repl))
-        if not python_has_wrapped:
-            inner.__wrapped__ = func
-        if new_sig is not None:
-            inner.__signature__ = new_sig
+        inner.__doc__ = pre_doc + _data_doc_appendix(replace_names,
+                                                     replace_all_args)
+        inner.__signature__ = new_sig
         return inner
     return param
 
-try:
-    import matplotlib.preprocess_data as _preprocess_data
-except ImportError:
-    # Not available in this version of matplotlib. Fail
-    # back to the vendored version copied from an earlier
-    # matplotlib release.
-    pass
-
 
-@contextmanager
 def _legacy_hold(ax, kwargs):
     """
-    This only does anything if hold was specified
-    and hold is even supported by matplotlib.
+    Pop *hold* from kwargs and apply it to the axes.
+
+    This only does anything if hold was specified and hold is even
+    supported by matplotlib.  Returns the previous hold state, to be
+    restored with `_restore_hold`, or None if hold is not supported.
     """
     h = kwargs.pop('hold', None)
-    if hasattr(ax, '_hold'):
-        _tmp_hold = ax._hold
-        if h is not None:
-            ax._hold = h
-            if not h:
-                ax.cla()
-    try:
-        yield
-    finally:
-        if hasattr(ax, '_hold'):
-            ax._hold = _tmp_hold
+    if not hasattr(ax, '_hold'):
+        return None
+    _tmp_hold = ax._hold
+    if h is not None:
+        ax._hold = h
+        if not h:
+            ax.cla()
+    return _tmp_hold
+
+
+def _restore_hold(ax, hold):
+    if hold is not None:
+        ax._hold = hold
 
 
 @_preprocess_data()
 def contour(ax, *args, **kwargs):
-    with _legacy_hold(ax, kwargs):
+    _tmp_hold = _legacy_hold(ax, kwargs)
+    try:
         kwargs['filled'] = False
         contours = LegacyContourSet(ax, *args, **kwargs)
         ax.autoscale_view()
+    finally:
+        _restore_hold(ax, _tmp_hold)
 
     #if contours._A is not None: ax.figure.sci(contours)
     return contours
@@ -375,10 +472,13 @@ contour.__doc__ = LegacyContourSet.contour_doc
 
 @_preprocess_data()
 def contourf(ax, *args, **kwargs):
-    with _legacy_hold(ax, kwargs):
+    _tmp_hold = _legacy_hold(ax, kwargs)
+    try:
         kwargs['filled'] = True
         contours = LegacyContourSet(ax, *args, **kwargs)
         ax.autoscale_view()
+    finally:
+        _restore_hold(ax, _tmp_hold)
 
     #if contours._A is not None: ax.figure.sci(contours)
     return contours
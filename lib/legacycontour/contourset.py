@@ -6,6 +6,9 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 
+from concurrent.futures import ThreadPoolExecutor
+import os
+
 import matplotlib as mpl
 import numpy as np
 from numpy import ma
@@ -13,6 +16,20 @@ from matplotlib.contour import QuadContourSet
 
 import legacycontour._cntr as cntr
 
+# Grids with fewer points than this are traced one level after another;
+# handing a level to a worker thread costs more than tracing it.
+_PARALLEL_MIN_POINTS = 10000
+
+_executor = None
+
+
+def _get_executor():
+    """Return the thread pool used to trace levels concurrently."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+    return _executor
+
 
 class LegacyContourSet(QuadContourSet):
     """
@@ -49,9 +66,18 @@ class LegacyContourSet(QuadContourSet):
             _mask = ma.getmask(z)
             if _mask is ma.nomask or not _mask.any():
                 _mask = None
+            else:
+                # Same itemsize as the int8 Cntr wants, so this avoids a
+                # converted copy of the mask.
+                _mask = _mask.view(np.int8)
 
             if self._corner_mask == 'legacy':
-                contour_generator = cntr.Cntr(x, y, z.filled(), _mask)
+                # Without a mask there is nothing to fill, so hand over the
+                # underlying data instead of a filled copy; Cntr makes its
+                # own contiguous float64 array only if it needs to.
+                z_data = ma.getdata(z) if _mask is None else z.filled()
+                contour_generator = cntr.Cntr(x, y, z_data, _mask)
+                npoints = z.size
 
 
         return_args = super(
@@ -60,6 +86,7 @@ class LegacyContourSet(QuadContourSet):
         if self._corner_mask == 'legacy':
             self.Cntr = contour_generator
             self._contour_generator = contour_generator
+            self._npoints = npoints
         return return_args
 
     def _get_allsegs_and_allkinds(self):
@@ -67,30 +94,74 @@ class LegacyContourSet(QuadContourSet):
         Create and return allsegs and allkinds by calling underlying C code.
         """
         if self._corner_mask == 'legacy':
-            allsegs = []
             if self.filled:
                 lowers, uppers = self._get_lowers_and_uppers()
-                allkinds = []
-                for level, level_upper in zip(lowers, uppers):
-                    nlist = self.Cntr.trace(level, level_upper,
-                                            nchunk=self.nchunk)
-                    nseg = len(nlist) // 2
-                    vertices = nlist[:nseg]
-                    kinds = nlist[nseg:]
-                    allsegs.append(vertices)
-                    allkinds.append(kinds)
+                results = self._trace_levels(lowers, uppers)
+                allsegs = [vertices for vertices, kinds in results]
+                allkinds = [kinds for vertices, kinds in results]
             else:
+                results = self._trace_levels(self.levels)
+                allsegs = [vertices for vertices, kinds in results]
                 allkinds = None
-                for level in self.levels:
-                    nlist = self.Cntr.trace(level)
-                    nseg = len(nlist) // 2
-                    vertices = nlist[:nseg]
-                    allsegs.append(vertices)
         else:
             allsegs, allkinds = super(
                     LegacyContourSet, self)._get_allsegs_and_allkinds()
         return allsegs, allkinds
 
+    def _trace_levels(self, lowers, uppers=None):
+        """
+        Trace each level (or each pair of levels, if *uppers* is given).
+
+        Levels that cannot cut the data are not traced at all; their
+        result is empty.
+        """
+        lowers = np.asarray(lowers, dtype=np.float64)
+        # A line level cuts the data only if zmin <= level < zmax, and a
+        # band only if lower < zmax and upper >= zmin (the tracer treats
+        # a point equal to a level as below it).  Cntr.trace draws lines
+        # at the lower level when upper <= lower.
+        line = (lowers >= self.zmin) & (lowers < self.zmax)
+        if uppers is None:
+            active = line
+        else:
+            uppers = np.asarray(uppers, dtype=np.float64)
+            band = (lowers < self.zmax) & (uppers >= self.zmin)
+            active = np.where(uppers > lowers, band, line)
+        if active.all():
+            return self._trace_active(lowers, uppers)
+
+        results = [([], []) for _ in range(len(lowers))]
+        indices = np.flatnonzero(active)
+        if len(indices):
+            traced = self._trace_active(
+                lowers[indices], None if uppers is None else uppers[indices])
+            for i, result in zip(indices, traced):
+                results[i] = result
+        return results
+
+    def _trace_active(self, lowers, uppers=None):
+        """
+        Trace each level in *lowers* (paired with *uppers*, if given).
+
+        Cntr.trace releases the GIL, so on large grids the levels are
+        spread over a thread pool; otherwise they are all traced by a
+        single Cntr.trace_many call.
+        """
+        if ((os.cpu_count() or 1) < 2 or len(lowers) < 2 or
+                self._npoints < _PARALLEL_MIN_POINTS):
+            return self.Cntr.trace_many(lowers, uppers, nchunk=self.nchunk)
+        # Plain floats are what Cntr.trace parses fastest.
+        lowers = lowers.tolist()
+        trace = self.Cntr.trace
+        nchunk = self.nchunk
+        if uppers is None:
+            return list(_get_executor().map(
+                lambda level: trace(level, nchunk=nchunk), lowers))
+        uppers = uppers.tolist()
+        return list(_get_executor().map(
+            lambda lower, upper: trace(lower, upper, nchunk=nchunk),
+            lowers, uppers))
+
     contour_doc = """
         Plot contours.
 
@@ -2,6 +2,7 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import datetime
+import os
 
 import numpy as np
 from matplotlib import mlab
@@ -14,6 +15,8 @@ import warnings
 import re
 
 from legacycontour import contour, contourf
+from legacycontour import contourset
+import legacycontour._cntr as _cntr
 
 def test_contour_shape_1d_valid():
 
@@ -376,3 +379,81 @@ def test_circular_contour_warning():
         cs = contour(plt.gca(), x, y, r)
         plt.clabel(cs)
     assert len(record) == 0
+
+
+def _make_cntr(masked):
+    # 120 x 100 points is enough for _trace_levels to use its thread pool.
+    ny, nx = 120, 100
+    x, y = np.meshgrid(np.linspace(0, 2, nx), np.linspace(0, 3, ny))
+    rng = np.random.RandomState(0)
+    z = np.cos(5 * x) * np.sin(4 * y) + 0.5 * rng.rand(ny, nx)
+    mask = rng.rand(ny, nx) > 0.9 if masked else None
+    return _cntr.Cntr(x, y, z, mask), z
+
+
+def _assert_traces_equal(actual, expected):
+    assert len(actual) == len(expected)
+    for (segs, kinds), (expected_segs, expected_kinds) in zip(actual,
+                                                               expected):
+        assert len(segs) == len(expected_segs)
+        assert len(kinds) == len(expected_kinds)
+        for a, b in zip(segs, expected_segs):
+            np.testing.assert_array_equal(a, b)
+        for a, b in zip(kinds, expected_kinds):
+            np.testing.assert_array_equal(a, b)
+
+
+@pytest.mark.parametrize('masked', [False, True])
+@pytest.mark.parametrize('nchunk', [0, 5])
+def test_cntr_trace_many(masked, nchunk):
+    c, z = _make_cntr(masked)
+    levels = np.linspace(z.min() - 0.1, z.max() + 0.1, 9)
+
+    _assert_traces_equal(c.trace_many(levels, nchunk=nchunk),
+                         [c.trace(level, nchunk=nchunk) for level in levels])
+
+    # Pairs with upper <= lower trace lines at the lower level, as trace
+    # does.
+    lowers = np.append(levels[:-1], levels[4])
+    uppers = np.append(levels[1:], levels[2])
+    _assert_traces_equal(
+        c.trace_many(lowers, uppers, nchunk=nchunk),
+        [c.trace(lower, upper, nchunk=nchunk)
+         for lower, upper in zip(lowers, uppers)])
+
+
+def test_cntr_trace_many_length_mismatch():
+    c, z = _make_cntr(False)
+    with pytest.raises(ValueError) as excinfo:
+        c.trace_many([0, 0.5, 1], [0.5, 1])
+    excinfo.match(r'must have the same length')
+
+
+@pytest.mark.parametrize('cpu_count', [1, 4])
+@pytest.mark.parametrize('masked', [False, True])
+def test_trace_levels(monkeypatch, cpu_count, masked):
+    monkeypatch.setattr(os, 'cpu_count', lambda: cpu_count)
+    monkeypatch.setattr(contourset, '_executor', None)
+    c, z = _make_cntr(masked)
+    # Bypass __init__: with newer matplotlib, contour() never takes the
+    # legacy path, so this is the only way to reach _trace_levels.
+    cs = object.__new__(contourset.LegacyContourSet)
+    cs.Cntr = c
+    cs.nchunk = 3
+    cs.zmin = z.min()
+    cs.zmax = z.max()
+    cs._npoints = z.size
+    levels = np.concatenate([[cs.zmin - 1, cs.zmin],
+                             np.linspace(cs.zmin + 0.1, cs.zmax - 0.1, 6),
+                             [cs.zmax, cs.zmax + 1]])
+
+    _assert_traces_equal(cs._trace_levels(levels),
+                         [c.trace(level, nchunk=3) for level in levels])
+
+    lowers = np.append(levels[:-1], cs.zmax)
+    uppers = np.append(levels[1:], cs.zmin)
+    _assert_traces_equal(
+        cs._trace_levels(lowers, uppers),
+        [c.trace(lower, upper, nchunk=3)
+         for lower, upper in zip(lowers, uppers)])
+    assert (contourset._executor is not None) == (cpu_count > 1)
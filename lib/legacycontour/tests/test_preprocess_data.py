@@ -0,0 +1,77 @@
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import pytest
+
+from legacycontour import _preprocess_data
+
+
+def plot_func(ax, x, y, ls="x", label=None, w="xyz"):
+    return ("x: %s, y: %s, ls: %s, w: %s, label: %s" % (
+        list(x), list(y), ls, w, label))
+
+
+def varargs_func(ax, *args, **kwargs):
+    return "args: %r, kwargs: %r" % (args, sorted(kwargs.items()))
+
+
+all_funcs = [
+    _preprocess_data()(plot_func),
+    _preprocess_data(replace_names=["x", "y"])(plot_func),
+    _preprocess_data(replace_names=["x", "y"], label_namer="y")(plot_func),
+]
+all_func_ids = ['all', 'replace_names', 'label_namer']
+
+
+@pytest.mark.parametrize('func', all_funcs, ids=all_func_ids)
+def test_function_call_without_data(func):
+    assert (func(None, [1, 2], [3, 4]) ==
+            "x: [1, 2], y: [3, 4], ls: x, w: xyz, label: None")
+    assert (func(None, x=[1, 2], y=[3, 4], label="") ==
+            "x: [1, 2], y: [3, 4], ls: x, w: xyz, label: ")
+
+
+@pytest.mark.parametrize('func, label',
+                         list(zip(all_funcs, [None, None, "b"])),
+                         ids=all_func_ids)
+def test_function_call_with_data(func, label):
+    data = {"a": [1, 2], "b": [8, 9], "w": "NOT"}
+    assert (func(None, "a", "b", data=data) ==
+            "x: [1, 2], y: [8, 9], ls: x, w: xyz, label: %s" % label)
+    assert (func(None, x="a", y="b", data=data) ==
+            "x: [1, 2], y: [8, 9], ls: x, w: xyz, label: %s" % label)
+    # A user-supplied label is never replaced, even an empty one.
+    assert (func(None, "a", "b", label="", data=data) ==
+            "x: [1, 2], y: [8, 9], ls: x, w: xyz, label: ")
+
+
+def test_only_replace_names_are_replaced():
+    data = {"a": [1, 2], "b": [8, 9], "w": "NOT"}
+    func = _preprocess_data(replace_names=["x", "y"])(plot_func)
+    assert (func(None, "a", "b", w="w", data=data) ==
+            "x: [1, 2], y: [8, 9], ls: x, w: w, label: None")
+    func = _preprocess_data()(plot_func)
+    assert (func(None, "a", "b", w="w", data=data) ==
+            "x: [1, 2], y: [8, 9], ls: x, w: NOT, label: None")
+
+
+def test_positional_parameter_names():
+    data = {"a": [1, 2], "b": [8, 9]}
+    func = _preprocess_data(replace_names=["x"],
+                            positional_parameter_names=["x", "y", "label"])(
+        varargs_func)
+    assert func(None, "a", "b", data=data) == "args: ([1, 2], 'b'), kwargs: []"
+
+    func = _preprocess_data(
+        replace_names=["x", "y"], label_namer="y",
+        positional_parameter_names=lambda args, data: ["x", "y", "c"][
+            :len(args)])(varargs_func)
+    assert (func(None, "a", "b", data=data) ==
+            "args: ([1, 2], [8, 9]), kwargs: [('label', 'b')]")
+    assert (func(None, "a", "b", "c", data=data) ==
+            "args: ([1, 2], [8, 9], 'c'), kwargs: [('label', 'b')]")
+
+
+def test_label_namer_not_in_signature():
+    with pytest.raises(AssertionError):
+        _preprocess_data(replace_names=["x"], label_namer="q")(plot_func)
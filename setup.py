@@ -11,7 +11,10 @@ use_setuptools()
 from setuptools.command.test import test as TestCommand
 from setuptools.command.build_ext import build_ext as BuildExtCommand
 
+import shlex
+import subprocess
 import sys
+import sysconfig
 
 # distutils is breaking our sdists for files in symlinked dirs.
 # distutils will copy if os.link is not available, so this is a hack
@@ -53,9 +56,7 @@ from distutils.dist import Distribution
 import setupext
 from setupext import print_line, print_raw, print_message, print_status
 
-# Get the version from versioneer
 import versioneer
-__version__ = versioneer.get_version()
 
 
 # These are the packages in the order we want to display them.  This
@@ -94,13 +95,87 @@ class NoopTestCommand(TestCommand):
               "'python setup.py test'. Please run 'python tests.py'")
 
 
+# Workload used to train a profile-guided build of the _cntr extension.
+# It is given the path of the instrumented extension module.
+_pgo_training = """
+import importlib.util, sys
+import numpy as np
+spec = importlib.util.spec_from_file_location('legacycontour._cntr',
+                                              sys.argv[1])
+cntr = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(cntr)
+rng = np.random.RandomState(0)
+for ny, nx in [(30, 40), (200, 150)]:
+    x, y = np.meshgrid(np.linspace(0, 2, nx), np.linspace(0, 3, ny))
+    z = np.cos(5 * x) * np.sin(4 * y) + 0.5 * rng.rand(ny, nx)
+    for mask in (None, rng.rand(ny, nx) > 0.9):
+        c = cntr.Cntr(x, y, z, mask)
+        levels = np.linspace(z.min(), z.max(), 12)
+        c.trace_many(levels)
+        c.trace_many(levels[:-1], levels[1:])
+        c.trace_many(levels[:-1], levels[1:], nchunk=20)
+"""
+
+
+def _compiler_is_gcc():
+    """
+    Return whether the C compiler distutils will use is gcc.  clang
+    (including the one installed as gcc on macOS) needs its profiles
+    merged with llvm-profdata, so it can't do our profile-guided build.
+    """
+    if sys.platform == 'win32' and setupext.win32_compiler == 'msvc':
+        return False
+    cc = os.environ.get('CC') or sysconfig.get_config_var('CC')
+    if not cc:
+        return False
+    try:
+        output = subprocess.check_output(shlex.split(cc) + ['--version'],
+                                         stderr=subprocess.STDOUT)
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return b'Free Software Foundation' in output
+
+
 class BuildExtraLibraries(BuildExtCommand):
     def run(self):
         for package in good_packages:
             package.do_custom_build()
 
+        if setupext.options['pgo']:
+            if _compiler_is_gcc():
+                return self.run_pgo()
+            print_message("Profile-guided builds need gcc; "
+                          "building without one.")
         return BuildExtCommand.run(self)
 
+    def run_pgo(self):
+        """
+        Do a profile-guided build (gcc only): build instrumented
+        extensions, train them on a typical contouring workload, then
+        build them again using the recorded profile.
+        """
+        profile_dir = os.path.abspath(os.path.join(self.build_temp, 'pgo'))
+        compile_args = dict((ext.name, list(ext.extra_compile_args))
+                            for ext in self.extensions)
+        link_args = dict((ext.name, list(ext.extra_link_args))
+                         for ext in self.extensions)
+        # build_ext.run replaces the compiler name with a compiler object
+        compiler = self.compiler
+
+        def build(flags):
+            self.compiler = compiler
+            for ext in self.extensions:
+                ext.extra_compile_args = compile_args[ext.name] + flags
+                ext.extra_link_args = link_args[ext.name] + flags
+            self.force = True
+            BuildExtCommand.run(self)
+
+        build(['-fprofile-generate=' + profile_dir])
+        subprocess.check_call(
+            [sys.executable, '-c', _pgo_training,
+             self.get_ext_fullpath('legacycontour._cntr')])
+        build(['-fprofile-use=' + profile_dir, '-fprofile-correction'])
+
 
 cmdclass = versioneer.get_cmdclass()
 cmdclass['test'] = NoopTestCommand
@@ -122,8 +197,9 @@ if __name__ == '__main__':
     setup_requires = []
 
     # If the user just queries for information, don't bother figuring out which
-    # packages to build or install.
-    if (any('--' + opt in sys.argv for opt in
+    # packages to build or install.  (The display option names are attribute
+    # names, e.g. help_commands for --help-commands.)
+    if (any('--' + opt.replace('_', '-') in sys.argv for opt in
             Distribution.display_option_names + ['help']) or
             'clean' in sys.argv):
         setup_requires = []
@@ -181,10 +257,11 @@ if __name__ == '__main__':
                 ext_modules.append(ext)
             data = package.get_package_data()
             for key, val in data.items():
-                package_data.setdefault(key, [])
-                package_data[key] = list(set(val + package_data[key]))
+                package_data.setdefault(key, set()).update(val)
             install_requires.extend(package.get_install_requires())
             setup_requires.extend(package.get_setup_requires())
+        package_data = dict((key, sorted(val))
+                            for key, val in package_data.items())
 
         # Build in verbose mode if requested
         if setupext.options['verbose']:
@@ -198,6 +275,11 @@ if __name__ == '__main__':
 
     extra_args = {}
 
+    # Get the version from versioneer.  This runs git, so it is only done
+    # here rather than whenever this file is imported (e.g. by the
+    # processes multiprocessing spawns on Windows).
+    __version__ = versioneer.get_version()
+
     # Finally, pass this all along to distutils to do the heavy lifting.
     distrib = setup(
         name="legacycontour",
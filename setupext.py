@@ -1,47 +1,37 @@
 from __future__ import print_function, absolute_import
 
-from importlib import import_module
-
-from distutils import sysconfig
 from distutils import version
 from distutils.core import Extension
 import distutils.command.build_ext
-import glob
-import multiprocessing
 import os
-import platform
 import re
-import subprocess
-from subprocess import check_output
 import sys
 import warnings
 from textwrap import fill
-import shutil
-import versioneer
 
 
 PY3min = (sys.version_info[0] >= 3)
 
 
-if sys.platform != 'win32':
-    if not PY3min:
-        from commands import getstatusoutput
-    else:
-        from subprocess import getstatusoutput
-
-
 if PY3min:
     import configparser
 else:
     import ConfigParser as configparser
 
+try:
+    from packaging.version import InvalidVersion, Version
+except ImportError:
+    Version = None
+
 
 # matplotlib build options, which can be altered using setup.cfg
 options = {
     'display_status': True,
     'verbose': False,
     'backend': None,
-    'basedirlist': None
+    'basedirlist': None,
+    'native_arch': False,
+    'pgo': False,
     }
 
 
@@ -64,6 +54,13 @@ if os.path.exists(setup_cfg):
             x.strip() for x in
             config.get("directories", "basedirlist").split(',')]
 
+    if config.has_option('optimization', 'native_arch'):
+        options['native_arch'] = config.getboolean("optimization",
+                                                   "native_arch")
+
+    if config.has_option('optimization', 'pgo'):
+        options['pgo'] = config.getboolean("optimization", "pgo")
+
     if config.has_option('test', 'local_freetype'):
         options['local_freetype'] = config.getboolean("test", "local_freetype")
 else:
@@ -82,16 +79,41 @@ def get_win32_compiler():
 win32_compiler = get_win32_compiler()
 
 
+_versions = None
+# Matches e.g. __version__numpy__ = str('1.7.1')
+_version_re = re.compile(
+    r"""^(__version__\w+__)\s*=\s*(?:str\()?(['"])([^'"]+)\2""",
+    re.MULTILINE)
+
+
 def extract_versions():
     """
     Extracts version values from the main matplotlib __init__.py and
     returns them as a dictionary.
     """
-    with open('lib/legacycontour/__init__.py') as fd:
-        for line in fd.readlines():
-            if (line.startswith('__version__numpy__')):
-                exec(line.strip())
-    return locals()
+    global _versions
+    if _versions is None:
+        with open('lib/legacycontour/__init__.py') as fd:
+            _versions = dict((m.group(1), m.group(3))
+                             for m in _version_re.finditer(fd.read()))
+    return dict(_versions)
+
+
+# Results of os.path.exists for the paths probed while configuring
+# extensions; these are the same system paths for every extension.
+_path_exists_cache = {}
+
+
+def _exists(path):
+    """
+    Returns `os.path.exists(path)`, remembering the answer for the rest
+    of the build.
+    """
+    try:
+        return _path_exists_cache[path]
+    except KeyError:
+        result = _path_exists_cache[path] = os.path.exists(path)
+        return result
 
 
 def has_include_file(include_dirs, filename):
@@ -100,9 +122,11 @@ def has_include_file(include_dirs, filename):
     directories in `include_dirs`.
     """
     if sys.platform == 'win32':
-        include_dirs += os.environ.get('INCLUDE', '.').split(';')
+        # Don't extend the caller's list in place, or it grows on every call
+        include_dirs = (list(include_dirs) +
+                        os.environ.get('INCLUDE', '.').split(';'))
     for dir in include_dirs:
-        if os.path.exists(os.path.join(dir, filename)):
+        if _exists(os.path.join(dir, filename)):
             return True
     return False
 
@@ -118,10 +142,24 @@ def check_include_file(include_dirs, filename, package):
             (package, filename))
 
 
+# The base and include directories only depend on the configuration and
+# the environment, which don't change during a build, so they are only
+# worked out once.
+_base_dirs = None
+_include_dirs = None
+
+
 def get_base_dirs():
     """
     Returns a list of standard base directories on this platform.
     """
+    global _base_dirs
+    if _base_dirs is None:
+        _base_dirs = tuple(_find_base_dirs())
+    return list(_base_dirs)
+
+
+def _find_base_dirs():
     if options['basedirlist']:
         return options['basedirlist']
 
@@ -149,13 +187,16 @@ def get_include_dirs():
     """
     Returns a list of standard include directories on this platform.
     """
-    include_dirs = [os.path.join(d, 'include') for d in get_base_dirs()]
-    if sys.platform != 'win32':
-        # gcc includes this dir automatically, so also look for headers in
-        # these dirs
-        include_dirs.extend(
-            os.environ.get('CPLUS_INCLUDE_PATH', '').split(os.pathsep))
-    return include_dirs
+    global _include_dirs
+    if _include_dirs is None:
+        include_dirs = [os.path.join(d, 'include') for d in get_base_dirs()]
+        if sys.platform != 'win32':
+            # gcc includes this dir automatically, so also look for headers
+            # in these dirs
+            include_dirs.extend(
+                os.environ.get('CPLUS_INCLUDE_PATH', '').split(os.pathsep))
+        _include_dirs = tuple(include_dirs)
+    return list(_include_dirs)
 
 
 def is_min_version(found, minversion):
@@ -163,6 +204,12 @@ def is_min_version(found, minversion):
     Returns `True` if `found` is at least as high a version as
     `minversion`.
     """
+    if Version is not None:
+        try:
+            return Version(found) >= Version(minversion)
+        except InvalidVersion:
+            # e.g. pkg-config versions that aren't PEP 440 compliant
+            pass
     expected_version = version.LooseVersion(minversion)
     found_version = version.LooseVersion(found)
     return found_version >= expected_version
@@ -170,21 +217,27 @@ def is_min_version(found, minversion):
 
 # Define the display functions only if display_status is True.
 if options['display_status']:
+    def _fill(text, initial_indent, subsequent_indent):
+        # Most messages fit on one line as they are, which is what fill
+        # would produce for them, so only bring in textwrap for the rest.
+        if (text and len(initial_indent) + len(text) <= 76 and
+                text == text.strip() and
+                not any(c in text for c in '\t\n\x0b\x0c\r')):
+            return initial_indent + text
+        return fill(text, width=76, initial_indent=initial_indent,
+                    subsequent_indent=subsequent_indent)
+
     def print_line(char='='):
         print(char * 76)
 
     def print_status(package, status):
         initial_indent = "%22s: " % package
         indent = ' ' * 24
-        print(fill(str(status), width=76,
-                   initial_indent=initial_indent,
-                   subsequent_indent=indent))
+        print(_fill(str(status), initial_indent, indent))
 
     def print_message(message):
         indent = ' ' * 24 + "* "
-        print(fill(str(message), width=76,
-                   initial_indent=indent,
-                   subsequent_indent=indent))
+        print(_fill(str(message), indent, indent))
 
     def print_raw(section):
         print(section)
@@ -225,11 +278,11 @@ def make_extension(name, files, *args, **kwargs):
     ext = DelayedExtension(name, files, *args, **kwargs)
     for dir in get_base_dirs():
         include_dir = os.path.join(dir, 'include')
-        if os.path.exists(include_dir):
+        if _exists(include_dir):
             ext.include_dirs.append(include_dir)
         for lib in ('lib', 'lib64'):
             lib_dir = os.path.join(dir, lib)
-            if os.path.exists(lib_dir):
+            if _exists(lib_dir):
                 ext.library_dirs.append(lib_dir)
     ext.include_dirs.append('.')
 
@@ -241,16 +294,63 @@ def get_file_hash(filename):
     Get the MD5 hash of a given filename.
     """
     import hashlib
-    BLOCKSIZE = 1 << 16
-    hasher = hashlib.md5()
     with open(filename, 'rb') as fd:
-        buf = fd.read(BLOCKSIZE)
-        while len(buf) > 0:
-            hasher.update(buf)
-            buf = fd.read(BLOCKSIZE)
+        # Python 3.11+ can stream the file through the hash in C
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(fd, 'md5').hexdigest()
+        hasher = hashlib.md5()
+        buf = bytearray(1 << 20)
+        view = memoryview(buf)
+        n = fd.readinto(buf)
+        while n:
+            hasher.update(view[:n])
+            n = fd.readinto(buf)
     return hasher.hexdigest()
 
 
+_linux_release = None
+
+
+def _get_linux_release():
+    """
+    Returns the lower-case ID of the Linux distribution (e.g. 'ubuntu'),
+    as given in /etc/os-release, or '' if it can't be determined.
+    """
+    global _linux_release
+    if _linux_release is None:
+        _linux_release = ''
+        try:
+            with open('/etc/os-release') as fd:
+                for line in fd:
+                    if line.startswith('ID='):
+                        _linux_release = (
+                            line[3:].strip().strip('"\'').lower())
+                        break
+        except (IOError, OSError):
+            pass
+    return _linux_release
+
+
+_found_programs = {}
+
+
+def _has_program(name):
+    """
+    Returns `True` if the program `name` is on the PATH.  Each program is
+    only looked up once per build.
+    """
+    if name not in _found_programs:
+        if PY3min:
+            import shutil
+            found = shutil.which(name) is not None
+        else:
+            found = any(
+                os.access(os.path.join(path, name), os.X_OK)
+                for path in os.environ.get('PATH', '').split(os.pathsep))
+        _found_programs[name] = found
+    return _found_programs[name]
+
+
 class CheckFailed(Exception):
     """
     Exception thrown when a `SetupPackage.check` method fails.
@@ -417,16 +517,9 @@ class SetupPackage(object):
         def _try_managers(*managers):
             for manager in managers:
                 pkg_name = self.pkg_names.get(manager, None)
-                if pkg_name:
-                    try:
-                        # `shutil.which()` can be used when Python 2.7 support
-                        # is dropped. It is available in Python 3.3+
-                        _ = check_output(["which", manager],
-                                         stderr=subprocess.STDOUT)
-                        return ('Try installing {0} with `{1} install {2}`'
-                                .format(self.name, manager, pkg_name))
-                    except subprocess.CalledProcessError:
-                        pass
+                if pkg_name and _has_program(manager):
+                    return ('Try installing {0} with `{1} install {2}`'
+                            .format(self.name, manager, pkg_name))
 
         message = None
         if sys.platform == "win32":
@@ -437,10 +530,10 @@ class SetupPackage(object):
         elif sys.platform == "darwin":
             message = _try_managers("brew", "port")
         elif sys.platform.startswith("linux"):
-            release = platform.linux_distribution()[0].lower()
+            release = _get_linux_release()
             if release in ('debian', 'ubuntu'):
                 message = _try_managers('apt-get')
-            elif release in ('centos', 'redhat', 'fedora'):
+            elif release in ('centos', 'rhel', 'redhat', 'fedora'):
                 message = _try_managers('dnf', 'yum')
         return message
 
@@ -612,6 +705,9 @@ class DelayedExtension(Extension, object):
     on the system.
     """
     def __init__(self, *args, **kwargs):
+        # Values of the delayed members once their hooks have been run;
+        # needed before Extension.__init__ assigns the members.
+        self._resolved = {}
         super(DelayedExtension, self).__init__(*args, **kwargs)
         self._finalized = False
         self._hooks = {}
@@ -630,6 +726,7 @@ class DelayedExtension(Extension, object):
             for the member.
         """
         self._hooks[member] = func
+        self._resolved.pop(member, None)
 
     def finalize(self):
         self._finalized = True
@@ -643,44 +740,64 @@ class DelayedExtension(Extension, object):
 
             if obj._finalized:
                 if self._name in obj._hooks:
-                    result = obj._hooks[self._name]() + result
+                    # distutils reads the members many times during a
+                    # build, so only run the hook the first time.
+                    try:
+                        result = obj._resolved[self._name]
+                    except KeyError:
+                        result = obj._resolved[self._name] = (
+                            obj._hooks[self._name]() + result)
 
             return result
 
         def __set__(self, obj, value):
             setattr(obj, '_' + self._name, value)
+            obj._resolved.pop(self._name, None)
 
     include_dirs = DelayedMember('include_dirs')
 
 
+# numpy's include directory, found by the first include_dirs_hook call
+_numpy_include = None
+
+
 class Numpy(SetupPackage):
     name = "numpy"
 
     @staticmethod
     def include_dirs_hook():
+        # The hook runs on every access to a finalized extension's
+        # include_dirs, so only the first call does the work.
+        global _numpy_include
+        if _numpy_include is not None:
+            return [_numpy_include]
+
         if PY3min:
             import builtins
-            if hasattr(builtins, '__NUMPY_SETUP__'):
-                del builtins.__NUMPY_SETUP__
-            import imp
-            import numpy
-            imp.reload(numpy)
         else:
-            import __builtin__
-            if hasattr(__builtin__, '__NUMPY_SETUP__'):
-                del __builtin__.__NUMPY_SETUP__
-            import numpy
-            reload(numpy)
+            import __builtin__ as builtins
+        # The sentinel is only set when numpy was imported while it was
+        # being installed for us, in which case the module is incomplete
+        # and must be imported afresh; otherwise a reload is wasted work.
+        numpy_setup = hasattr(builtins, '__NUMPY_SETUP__')
+        if numpy_setup:
+            del builtins.__NUMPY_SETUP__
+        import numpy
+        if numpy_setup:
+            if PY3min:
+                import importlib
+                importlib.reload(numpy)
+            else:
+                reload(numpy)
 
-        ext = Extension('test', [])
-        ext.include_dirs.append(numpy.get_include())
+        _numpy_include = numpy.get_include()
         if not has_include_file(
-                ext.include_dirs, os.path.join("numpy", "arrayobject.h")):
+                [_numpy_include], os.path.join("numpy", "arrayobject.h")):
             warnings.warn(
                 "The C headers for numpy could not be found. "
                 "You may need to install the development package")
 
-        return [numpy.get_include()]
+        return [_numpy_include]
 
     def check(self):
         min_version = extract_versions()['__version__numpy__']
@@ -732,6 +849,15 @@ class ContourLegacy(SetupPackage):
             ]
         ext = make_extension('legacycontour._cntr', sources)
         Numpy().add_flags(ext)
+        # The tracer is the hot loop, so ask gcc/clang for their full
+        # optimization level.  Code tuned for the build machine can't be
+        # shipped in wheels, so -march=native is only used on request.
+        # -ffast-math is never used: the tracer relies on IEEE comparisons
+        # (NaN, exact end point matches) to reproduce the legacy output.
+        if not (sys.platform == 'win32' and win32_compiler == 'msvc'):
+            ext.extra_compile_args.append('-O3')
+            if options['native_arch']:
+                ext.extra_compile_args.append('-march=native')
         return ext
 
 
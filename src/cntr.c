@@ -281,6 +281,11 @@ void print_Csite(Csite *Csite)
 #define POINT1(edge,fwd) ((edge)+((fwd)<0?fwd:0))
 #define IS_JEDGE(edge,left) ((left)>0?((left)>1?1:0):((left)<-1?1:0))
 #define ANY_START (I0_START|I1_START|J0_START|J1_START)
+/* the 0, 1, 2 Z_VALUE of a point, computed from comparisons rather than
+ * branches since the outcome is unpredictable on noisy data
+ * -- for a single level, zlev1 == zlev0 and two_levels is 0 */
+#define Z_CLASS(zv,zlev0,zlev1,two_levels) \
+  (((zv) > (zlev0)) + ((two_levels) & ((zv) > (zlev1))))
 #define START_MARK(left) \
   ((left)>0?((left)>1?J1_START:I1_START):((left)<-1?J0_START:I0_START))
 
@@ -1066,10 +1071,7 @@ data_init (Csite * site, long nchunk)
      * very large arrays)
      * access to the z and reg arrays is strictly sequential,
      * but we need two rows (+-imax) of the data array at a time */
-    if (z[0] > zlev0)
-        data[0] = (two_levels && z[0] > zlev1) ? 2 : 1;
-    else
-        data[0] = 0;
+    data[0] = Z_CLASS (z[0], zlev0, zlev1, two_levels);
     jchunk = 0;
     for (j = ij = 0; j < jmax; j++)
     {
@@ -1094,8 +1096,8 @@ data_init (Csite * site, long nchunk)
             /* translate z values to 0, 1, 2 flags */
             if (ij < imax)
                 data[ij + 1] = 0;
-            if (ij < ijmax - 1 && z[ij + 1] > zlev0)
-                data[ij + 1] |= (two_levels && z[ij + 1] > zlev1) ? 2 : 1;
+            if (ij < ijmax - 1)
+                data[ij + 1] |= Z_CLASS (z[ij + 1], zlev0, zlev1, two_levels);
 
             /* apply edge boundary marks */
             ibndy = i == ichunk
@@ -1484,65 +1486,96 @@ int reorder(double *xpp, double *ypp, short *kpp,
     return k;
 }
 
-/* Build a list of XY 2-D arrays, shape (N,2), to which a list of path
-        code arrays is concatenated.
+/* Make a C-contiguous array of the given shape and type that is a view
+        on data owned by base.
+*/
+static PyObject *
+view_on(PyArrayObject *base, int nd, npy_intp *dims, int typenum, void *data)
+{
+    PyObject *view;
+
+    view = PyArray_New(&PyArray_Type, nd, dims, typenum, NULL, data, 0,
+                       NPY_ARRAY_CARRAY, NULL);
+    if (view == NULL) return NULL;
+    Py_INCREF(base);
+    /* steals the reference to base, even on failure */
+    if (PyArray_SetBaseObject((PyArrayObject *)view, (PyObject *)base))
+    {
+        Py_DECREF(view);
+        return NULL;
+    }
+    return view;
+}
+
+/* Build a 2-tuple holding a list of XY 2-D arrays, shape (N,2), and
+        the matching list of path code arrays.
+   All the XY arrays are views on a single buffer, and likewise the code
+   arrays, so there are two allocations per call rather than per part.
 */
 static PyObject *
 build_cntr_list_v2(long *np, double *xp, double *yp, short *kp,
                                             int nparts, long ntotal)
 {
+    PyObject *xy_list;
+    PyObject *kind_list;
     PyObject *all_contours;
-    PyArrayObject *xyv = NULL;
-    PyArrayObject *kv = NULL;
+    PyObject *view;
+    PyArrayObject *xy_all = NULL;
+    PyArrayObject *k_all = NULL;
+    double *xy;
+    unsigned char *kinds;
     npy_intp dims[2];
     npy_intp kdims[1];
     int i;
-    long k;
-
-    PyArray_Dims newshape;
-
-    all_contours = PyList_New(nparts*2);
-
-    for (i=0, k=0; i < nparts; k+= np[i], i++)
+    long k, m;
+
+    xy_list = PyList_New(nparts);
+    kind_list = PyList_New(nparts);
+    if (xy_list == NULL || kind_list == NULL) goto error;
+
+    /* one spare point, as reorder can write one past the end of a part
+       before it detects that it has gone wrong */
+    dims[0] = ntotal + 1;
+    dims[1] = 2;
+    kdims[0] = ntotal + 1;
+    xy_all = (PyArrayObject *) PyArray_SimpleNew(2, dims, NPY_DOUBLE);
+    if (xy_all == NULL) goto error;
+    k_all = (PyArrayObject *) PyArray_SimpleNew(1, kdims, NPY_UBYTE);
+    if (k_all == NULL) goto error;
+    xy = (double *) PyArray_DATA(xy_all);
+    kinds = (unsigned char *) PyArray_DATA(k_all);
+
+    for (i=0, k=0, m=0; i < nparts; k+= np[i], i++)
     {
-        double *xpp = xp+k;
-        double *ypp = yp+k;
-        short *kpp = kp+k;
         int n;
 
-
-        dims[0] = np[i];
-        dims[1] = 2;
-        kdims[0] = np[i];
-        xyv = (PyArrayObject *) PyArray_SimpleNew(2, dims, NPY_DOUBLE);
-        if (xyv == NULL)  goto error;
-        kv = (PyArrayObject *) PyArray_SimpleNew(1, kdims, NPY_UBYTE);
-        if (kv == NULL) goto error;
-
-        n = reorder(xpp, ypp, kpp,
-                        (double *) PyArray_DATA(xyv),
-                        (unsigned char *) PyArray_DATA(kv),
-                        np[i]);
+        n = reorder(xp+k, yp+k, kp+k, xy+2*m, kinds+m, np[i]);
         if (n == -1) goto error;
-        newshape.len = 2;
         dims[0] = n;
-        newshape.ptr = dims;
-        if (PyArray_Resize(xyv, &newshape, 1, NPY_CORDER) == NULL) goto error;
-
-        newshape.len = 1;  /* ptr, dims can stay the same */
-        if (PyArray_Resize(kv, &newshape, 1, NPY_CORDER) == NULL) goto error;
-
-
-        if (PyList_SetItem(all_contours, i, (PyObject *)xyv)) goto error;
-        if (PyList_SetItem(all_contours, nparts+i,
-                                (PyObject *)kv)) goto error;
+        kdims[0] = n;
+
+        /* The lists are freshly made and i is in range, so these steal
+           the references and cannot fail. */
+        view = view_on(xy_all, 2, dims, NPY_DOUBLE, xy+2*m);
+        if (view == NULL) goto error;
+        PyList_SET_ITEM(xy_list, i, view);
+        view = view_on(k_all, 1, kdims, NPY_UBYTE, kinds+m);
+        if (view == NULL) goto error;
+        PyList_SET_ITEM(kind_list, i, view);
+        m += n;
     }
+    all_contours = PyTuple_Pack(2, xy_list, kind_list);
+    Py_DECREF(xy_all);
+    Py_DECREF(k_all);
+    Py_DECREF(xy_list);
+    Py_DECREF(kind_list);
     return all_contours;
 
     error:
-    Py_XDECREF(xyv);
-    Py_XDECREF(kv);
-    Py_XDECREF(all_contours);
+    Py_XDECREF(xy_all);
+    Py_XDECREF(k_all);
+    Py_XDECREF(xy_list);
+    Py_XDECREF(kind_list);
     return NULL;
 }
 
@@ -1603,19 +1636,27 @@ __build_cntr_list_v2(long *np, double *xp, double *yp, short *kp,
 /* cntr_trace is called once per contour level or level pair.
    If nlevels is 1, a set of contour lines will be returned; if nlevels
    is 2, the set of polygons bounded by the levels will be returned.
-   If points is True, the lines will be returned as a list of list
-   of points; otherwise, as a list of tuples of vectors.
+   The lines are returned as a tuple of a list of XY arrays and a list
+   of path code arrays.
+
+   The tracing works on a private copy of *shared* with its own data and
+   saddle arrays, and runs with the GIL released, so several levels of
+   the same Cntr may be traced at once from different threads.
 */
 
 PyObject *
-cntr_trace(Csite *site, double levels[], int nlevels, long nchunk)
+cntr_trace(Csite *shared, double levels[], int nlevels, long nchunk)
 {
     PyObject *c_list = NULL;
-    double *xp0;
-    double *yp0;
-    short *kp0;
-    long *nseg0;
+    Csite local;
+    Csite *site = &local;
+    double *xp0 = NULL;
+    double *yp0 = NULL;
+    short *kp0 = NULL;
+    long *nseg0 = NULL;
     int iseg;
+    int status = 0;
+    long ijmax = shared->imax * shared->jmax;
 
     /* long nchunk = 30; was hardwired */
     long n;
@@ -1624,6 +1665,16 @@ cntr_trace(Csite *site, double levels[], int nlevels, long nchunk)
     long nparts2 = 0;
     long ntotal2 = 0;
 
+    local = *shared;
+    local.data = (Cdata *) PyMem_Malloc(sizeof(Cdata)
+                                        * (ijmax + shared->imax + 1));
+    local.saddle = (Saddle *) PyMem_Malloc(sizeof(Saddle) * ijmax);
+    if (local.data == NULL || local.saddle == NULL)
+    {
+        PyErr_NoMemory();
+        goto error;
+    }
+
     site->zlevel[0] = levels[0];
     site->zlevel[1] = levels[0];
     if (nlevels == 2)
@@ -1631,6 +1682,8 @@ cntr_trace(Csite *site, double levels[], int nlevels, long nchunk)
         site->zlevel[1] = levels[1];
     }
     site->n = site->count = 0;
+
+    Py_BEGIN_ALLOW_THREADS
     data_init (site, nchunk);
 
     /* make first pass to compute required sizes for second pass */
@@ -1650,25 +1703,31 @@ cntr_trace(Csite *site, double levels[], int nlevels, long nchunk)
             ntotal -= n;
         }
     }
+    Py_END_ALLOW_THREADS
+
     xp0 = (double *) PyMem_Malloc(ntotal * sizeof(double));
     yp0 = (double *) PyMem_Malloc(ntotal * sizeof(double));
     kp0 = (short *) PyMem_Malloc(ntotal * sizeof(short));
     nseg0 = (long *) PyMem_Malloc(nparts * sizeof(long));
-    if (xp0 == NULL || yp0 == NULL || kp0 == NULL || nseg0 == NULL) goto error;
+    if (xp0 == NULL || yp0 == NULL || kp0 == NULL || nseg0 == NULL)
+    {
+        PyErr_NoMemory();
+        goto error;
+    }
 
     /* second pass */
     site->xcp = xp0;
     site->ycp = yp0;
     site->kcp = kp0;
     iseg = 0;
+    Py_BEGIN_ALLOW_THREADS
     for (;;iseg++)
     {
         n = curve_tracer (site, 1);
         if (ntotal2 + n > ntotal)
         {
-            PyErr_SetString(PyExc_RuntimeError,
-                "curve_tracer: ntotal2, pass 2 exceeds ntotal, pass 1");
-            goto error;
+            status = 1;
+            break;
         }
         if (n == 0)
             break;
@@ -1684,11 +1743,23 @@ cntr_trace(Csite *site, double levels[], int nlevels, long nchunk)
         }
         else
         {
-            PyErr_SetString(PyExc_RuntimeError,
-                "Negative n from curve_tracer in pass 2");
-            goto error;
+            status = 2;
+            break;
         }
     }
+    Py_END_ALLOW_THREADS
+    if (status == 1)
+    {
+        PyErr_SetString(PyExc_RuntimeError,
+            "curve_tracer: ntotal2, pass 2 exceeds ntotal, pass 1");
+        goto error;
+    }
+    if (status == 2)
+    {
+        PyErr_SetString(PyExc_RuntimeError,
+            "Negative n from curve_tracer in pass 2");
+        goto error;
+    }
 
     c_list = build_cntr_list_v2(nseg0, xp0, yp0, kp0, nparts, ntotal);
 
@@ -1696,9 +1767,11 @@ cntr_trace(Csite *site, double levels[], int nlevels, long nchunk)
     PyMem_Free(yp0);
     PyMem_Free(kp0);
     PyMem_Free(nseg0);
-    site->xcp = NULL;
-    site->ycp = NULL;
-    site->kcp = NULL;
+    /* keep the arrays of the latest trace around for get_cdata */
+    PyMem_Free(shared->data);
+    PyMem_Free(shared->saddle);
+    shared->data = local.data;
+    shared->saddle = local.saddle;
     return c_list;
 
     error:
@@ -1706,9 +1779,8 @@ cntr_trace(Csite *site, double levels[], int nlevels, long nchunk)
     PyMem_Free(yp0);
     PyMem_Free(kp0);
     PyMem_Free(nseg0);
-    site->xcp = NULL;
-    site->ycp = NULL;
-    site->kcp = NULL;
+    PyMem_Free(local.data);
+    PyMem_Free(local.saddle);
     Py_XDECREF(c_list);
     return NULL;
 }
@@ -1716,9 +1788,11 @@ cntr_trace(Csite *site, double levels[], int nlevels, long nchunk)
 /******* Make an extension type.  Based on the tutorial.************/
 
 /* site points to the data arrays in the arrays pointed to
-   by xpa, ypa, zpa, and mpa, so we include them in the
+   by xpa, ypa, and zpa, so we include them in the
    structure so we can ensure they are not deleted until
-   we have finished using them.
+   we have finished using them.  The mask is only read by
+   mask_zones, which folds it into site->reg, so Cntr_init
+   releases it straight away and mpa stays NULL.
 */
 typedef struct {
     PyObject_HEAD
@@ -1862,7 +1936,10 @@ Cntr_init(Cntr *self, PyObject *args, PyObject *kwds)
     self->xpa = xpa;
     self->ypa = ypa;
     self->zpa = zpa;
-    self->mpa = mpa;
+    /* the mask has been folded into site->reg, so it is not needed
+       after this point */
+    self->mpa = NULL;
+    Py_XDECREF(mpa);
     return 0;
 
     error:
@@ -1891,6 +1968,84 @@ Cntr_trace(Cntr *self, PyObject *args, PyObject *kwds)
     return cntr_trace(self->site, levels, nlevels, nchunk);
 }
 
+/* Trace every level (or level pair) in one call, so that the caller
+   does not have to cross the Python/C boundary once per level.
+   Returns a list holding the result of cntr_trace for each level.
+*/
+static PyObject *
+Cntr_trace_many(Cntr *self, PyObject *args, PyObject *kwds)
+{
+    PyObject *arg0, *arg1;
+    PyArrayObject *lpa0, *lpa1;
+    PyObject *c_list, *nlist;
+    double levels[2];
+    double *lp0, *lp1;
+    int nlevels;
+    long nchunk = 0L;
+    npy_intp i, n;
+    static const char *kwlist[] = {"levels0", "levels1",  "nchunk", NULL};
+
+    arg1 = NULL;
+    lpa1 = NULL;
+    c_list = NULL;
+
+    if (! PyArg_ParseTupleAndKeywords(args, kwds, "O|Ol", (char **)kwlist,
+                                      &arg0, &arg1, &nchunk))
+    {
+        return NULL;
+    }
+    if (arg1 == Py_None)
+        arg1 = NULL;
+
+    lpa0 = (PyArrayObject *) PyArray_ContiguousFromObject(arg0,
+                                                      NPY_DOUBLE, 1, 1);
+    if (lpa0 == NULL)
+        return NULL;
+    n = PyArray_DIM(lpa0, 0);
+    if (arg1)
+    {
+        lpa1 = (PyArrayObject *) PyArray_ContiguousFromObject(arg1,
+                                                      NPY_DOUBLE, 1, 1);
+        if (lpa1 == NULL)
+            goto error;
+        if (PyArray_DIM(lpa1, 0) != n)
+        {
+            PyErr_SetString(PyExc_ValueError,
+                "Arguments levels0 and levels1 must have the same length.");
+            goto error;
+        }
+    }
+    lp0 = (double *) PyArray_DATA(lpa0);
+    lp1 = lpa1 ? (double *) PyArray_DATA(lpa1) : NULL;
+
+    c_list = PyList_New(n);
+    if (c_list == NULL)
+        goto error;
+    for (i = 0; i < n; i++)
+    {
+        levels[0] = lp0[i];
+        nlevels = 1;
+        if (lp1 && lp1[i] > lp0[i])
+        {
+            levels[1] = lp1[i];
+            nlevels = 2;
+        }
+        nlist = cntr_trace(self->site, levels, nlevels, nchunk);
+        if (nlist == NULL)
+            goto error;
+        PyList_SET_ITEM(c_list, i, nlist);
+    }
+    Py_DECREF(lpa0);
+    Py_XDECREF(lpa1);
+    return c_list;
+
+    error:
+    Py_DECREF(lpa0);
+    Py_XDECREF(lpa1);
+    Py_XDECREF(c_list);
+    return NULL;
+}
+
 /* The following will not normally be called.  It is experimental,
    and intended for future debugging.  It may go away at any time.
 */
@@ -1918,7 +2073,8 @@ Cntr_get_cdata(Cntr *self)
 
 static PyMethodDef Cntr_methods[] = {
     {"trace", (PyCFunction)Cntr_trace, METH_VARARGS | METH_KEYWORDS,
-     "Return a list of contour line segments or polygons.\n\n"
+     "Return a tuple (vertices, kinds) of lists of contour line segments\n"
+     "or polygons and of their path codes.\n\n"
      "    Required argument: level0, a contour level\n"
      "    Optional argument: level1; if given, and if level1 > level0,\n"
      "        then the contours will be polygons surrounding areas between\n"
@@ -1928,6 +2084,15 @@ static PyMethodDef Cntr_methods[] = {
      "    Optional argument: nchunk; approximate number of grid points\n"
      "        per chunk. 0 (default) for no chunking.\n"
     },
+    {"trace_many", (PyCFunction)Cntr_trace_many,
+     METH_VARARGS | METH_KEYWORDS,
+     "Return a list with the result of trace for each level.\n\n"
+     "    Required argument: levels0, a sequence of contour levels\n"
+     "    Optional argument: levels1, a sequence of upper levels of the\n"
+     "        same length; each pair is traced as in trace(level0, level1).\n"
+     "    Optional argument: nchunk; approximate number of grid points\n"
+     "        per chunk. 0 (default) for no chunking.\n"
+    },
     {"get_cdata", (PyCFunction)Cntr_get_cdata, METH_NOARGS,
      "Returns a copy of the mesh array with contour calculation codes.\n\n"
      "Experimental and incomplete; we are not returning quite all of\n"